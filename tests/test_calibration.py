@@ -1,5 +1,7 @@
+from dataclasses import replace
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 from pytest import fixture
@@ -12,8 +14,8 @@ from vanilla_option_pricing.option import pandas_dataframe_to_option_list
 @fixture
 def option_list():
     path = Path(__file__).resolve().parent / 'test_data' / 'data.csv'
-    data_set = pd.read_csv(path, parse_dates=['date', 'maturity'], dayfirst=True)
-    return pandas_dataframe_to_option_list(data_set)
+    data_set = pd.read_csv(path)
+    return pandas_dataframe_to_option_list(data_set, dayfirst=True)
 
 
 def test_calibrate_black_model(option_list):
@@ -29,3 +31,45 @@ def test_calibrate_makes_deepcopy(option_list):
     res, new_model = calibrator.calibrate_model(model)
     assert new_model.s == pytest.approx(0.26914529578104857, abs=10e-4)
     assert model.s == pytest.approx(0.31408317454633633, abs=10e-4)
+
+
+def test_calibrate_least_squares(option_list):
+    calibrator = ModelCalibration(option_list)
+    model = GeometricBrownianMotion(0.31408317454633633)
+    res, new_model = calibrator.calibrate_model_least_squares(model)
+    assert res.x[0] == pytest.approx(0.26914529578104857, abs=10e-4)
+    assert new_model.s == pytest.approx(0.26914529578104857, abs=10e-4)
+    assert model.s == pytest.approx(0.31408317454633633, abs=10e-4)
+
+
+def test_calibrate_gradient_free_method(option_list):
+    calibrator = ModelCalibration(option_list)
+    model = GeometricBrownianMotion(0.31408317454633633)
+    res, model = calibrator.calibrate_model(model, method='Nelder-Mead')
+    assert res.x[0] == pytest.approx(0.26914529578104857, abs=10e-4)
+
+
+def test_calibrate_from_previous_result(option_list):
+    calibrator = ModelCalibration(option_list)
+    model = GeometricBrownianMotion(0.31408317454633633)
+    first_res, _ = calibrator.calibrate_model(model)
+    res, new_model = calibrator.calibrate_model(model, previous_result=first_res)
+    assert new_model.s == pytest.approx(0.26914529578104857, abs=10e-4)
+    assert res.nfev < first_res.nfev
+
+
+def test_calibrate_with_expiring_option(option_list):
+    option = option_list[0]
+    expiring = replace(option, option_type='c', maturity=option.date, price=max(option.spot - option.strike, 0))
+    calibrator = ModelCalibration(option_list + [expiring])
+    model = GeometricBrownianMotion(0.31408317454633633)
+    res, model = calibrator.calibrate_model_least_squares(model)
+    assert np.all(np.isfinite(res.jac))
+    assert model.s == pytest.approx(0.26914529578104857, abs=10e-4)
+
+
+def test_gradient_free_methods_are_not_given_a_gradient():
+    assert not ModelCalibration._uses_gradient('COBYQA')
+    assert not ModelCalibration._uses_gradient('Nelder-Mead')
+    assert ModelCalibration._uses_gradient('L-BFGS-B')
+    assert ModelCalibration._uses_gradient(lambda fun, x0, **kwargs: None)
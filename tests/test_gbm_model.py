@@ -1,7 +1,17 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+from py_vollib.black import undiscounted_black
+from py_vollib.black_scholes_merton import black_scholes_merton
 from pytest import fixture
 
 from tests.utils import check_exception_on_wrong_parameters
+from vanilla_option_pricing import option_pricing
 from vanilla_option_pricing.models import GeometricBrownianMotion
+from vanilla_option_pricing.option import option_type_signs
+from vanilla_option_pricing.option_pricing import _black_scholes_merton
 
 
 @fixture
@@ -13,9 +23,143 @@ def test_variance(model):
     assert model.variance(1) == 4
 
 
+def test_standard_deviation(model):
+    assert model.standard_deviation(4) == 4
+    np.testing.assert_array_equal(model.standard_deviation(np.array([1, 4])), [2, 4])
+    assert model.volatility(3) == 2
+
+
 def test_exception_on_illegal_parameters():
     check_exception_on_wrong_parameters(GeometricBrownianMotion, {'s': -1}, {'s': 1}, (-1,))
 
 
 def test_properties(model):
     assert model.parameters == (2,)
+
+
+class _PercentVolatilityModel(GeometricBrownianMotion):
+    def __init__(self, percent_volatility: float, name: str):
+        super().__init__(percent_volatility / 100)
+        self.name = name
+
+
+def test_clone_subclass():
+    original = _PercentVolatilityModel(20, 'percent')
+    clone = original.clone()
+    assert type(clone) == _PercentVolatilityModel
+    assert clone.name == 'percent'
+    assert clone.s == original.s
+    clone.s = 0.5
+    assert original.s == 0.2
+
+
+def test_black_vectorized_large_batch(model):
+    size = 40000
+    rng = np.random.default_rng(0)
+    option_types = np.where(rng.random(size) < 0.5, 'c', 'p')
+    spots = rng.uniform(50, 150, size)
+    strikes = rng.uniform(50, 150, size)
+    years_to_maturity = rng.uniform(0.1, 2, size)
+    prices = model.price_black_vectorized(option_types, spots, strikes, years_to_maturity)
+    for i in rng.integers(0, size, 20):
+        assert prices[i] == pytest.approx(
+            model.price_black(option_types[i], spots[i], strikes[i], years_to_maturity[i]),
+            abs=1e-8
+        )
+
+
+@pytest.mark.parametrize('option_type', ['c', 'p'])
+def test_black_matches_py_vollib(option_type):
+    model = GeometricBrownianMotion(0.3)
+    for strike in (80, 100, 120):
+        assert model.price_black(option_type, 100, strike, 0.5) == pytest.approx(
+            undiscounted_black(100, strike, 0.3, 0.5, option_type),
+            abs=1e-10
+        )
+
+
+@pytest.mark.parametrize('option_type', ['c', 'p'])
+def test_black_scholes_merton_matches_py_vollib(option_type):
+    model = GeometricBrownianMotion(0.3)
+    for strike in (80, 100, 120):
+        assert model.price_black_scholes_merton(option_type, 100, strike, 0.5, 0.03, 0.01) == pytest.approx(
+            black_scholes_merton(option_type, 100, strike, 0.5, 0.03, 0.3, 0.01),
+            abs=1e-10
+        )
+
+
+def test_black_scholes_merton_large_batch_matches_py_vollib():
+    model = GeometricBrownianMotion(0.3)
+    size = 40000
+    rng = np.random.default_rng(1)
+    option_types = np.where(rng.random(size) < 0.5, 'c', 'p')
+    spots = rng.uniform(50, 150, size)
+    strikes = rng.uniform(50, 150, size)
+    years_to_maturity = rng.uniform(0.1, 2, size)
+    dividends = rng.uniform(0, 0.05, size)
+    prices = _black_scholes_merton(
+        option_type_signs(option_types),
+        spots,
+        strikes,
+        years_to_maturity,
+        dividends,
+        np.exp(-0.03 * years_to_maturity),
+        model.standard_deviation(years_to_maturity)
+    )
+    for i in rng.integers(0, size, 20):
+        assert prices[i] == pytest.approx(
+            black_scholes_merton(option_types[i], spots[i], strikes[i], years_to_maturity[i], 0.03, 0.3, dividends[i]),
+            abs=1e-10
+        )
+
+
+def test_error_on_invalid_option_type(model):
+    with pytest.raises(ValueError):
+        model.price_black('x', 100, 100, 1)
+    with pytest.raises(ValueError):
+        model.price_black_scholes_merton('x', 100, 100, 1, 0.03)
+
+
+def test_black_without_volatility():
+    model = GeometricBrownianMotion(0)
+    assert model.price_black('c', 110, 100, 1) == 10
+    assert model.price_black('p', 110, 100, 1) == 0
+    assert GeometricBrownianMotion(0.3).price_black('p', 90, 100, 0) == 10
+
+
+def test_black_vectorized_without_volatility():
+    prices = GeometricBrownianMotion(0.3).price_black_vectorized(['c', 'p', 'c'], [110, 110, 100], 100, [0, 0, 0])
+    np.testing.assert_array_equal(prices, [10, 0, 0])
+
+
+def test_black_scholes_merton_without_volatility():
+    assert GeometricBrownianMotion(0).price_black_scholes_merton('c', 110, 100, 1, 0.02) == pytest.approx(
+        110 - 100 * np.exp(-0.02),
+        abs=1e-12
+    )
+    assert GeometricBrownianMotion(0.3).price_black_scholes_merton('c', 110, 100, 0, 0.02) == 10
+    prices = _black_scholes_merton(
+        np.array([1, -1]), 110, 100, np.array([1, 0]), 0, np.exp(-0.02 * np.array([1, 0])), 0
+    )
+    np.testing.assert_allclose(prices, [110 - 100 * np.exp(-0.02), 0], atol=1e-12)
+
+
+def test_large_batches_share_threads(model):
+    size = 40000
+    spots = np.full(size, 100.0)
+    model.price_black_vectorized(np.full(size, 'c'), spots, 100, 1)
+    executor = option_pricing._get_executor()
+    model.price_black_vectorized(np.full(size, 'p'), spots, 100, 1)
+    assert option_pricing._get_executor() is executor
+
+
+def _price_large_batch(size: int) -> float:
+    return float(GeometricBrownianMotion(0.3).price_black_vectorized('c', np.full(size, 100.0), 100, 1).sum())
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires the fork start method')
+def test_large_batches_after_fork():
+    size = 40000
+    expected = _price_large_batch(size)
+    with multiprocessing.get_context('fork').Pool(1) as pool:
+        assert pool.apply_async(_price_large_batch, (size,)).get(timeout=20) == pytest.approx(expected)
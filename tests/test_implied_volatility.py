@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from vanilla_option_pricing.implied_volatility import implied_volatility_of_undiscounted_price
+from vanilla_option_pricing.models import GeometricBrownianMotion
+
+
+def test_implied_volatility_round_trip():
+    volatilities = np.array([0.05, 0.2, 0.5, 1.5, 0.3, 0.8])
+    spots = np.array([100, 100, 80, 120, 100, 60])
+    strikes = np.array([101, 90, 100, 100, 100, 150])
+    years_to_maturity = np.array([0.1, 1, 2, 0.5, 3, 0.25])
+    option_types = np.array(['c', 'p', 'c', 'p', 'c', 'p'])
+    prices = np.array([
+        GeometricBrownianMotion(v).price_black(o, s, k, t)
+        for v, o, s, k, t in zip(volatilities, option_types, spots, strikes, years_to_maturity)
+    ])
+    implied = implied_volatility_of_undiscounted_price(prices, spots, strikes, years_to_maturity, option_types)
+    np.testing.assert_allclose(implied, volatilities, rtol=1e-8)
+
+
+def test_implied_volatility_scalar():
+    volatility = implied_volatility_of_undiscounted_price(1, 100, 101, 30 / 365.2425, 'c')
+    assert isinstance(volatility, float)
+    assert volatility == pytest.approx(0.12578680488787206, abs=1e-10)
+
+
+def test_implied_volatility_below_intrinsic():
+    assert np.isnan(implied_volatility_of_undiscounted_price(9, 110, 100, 1, 'c'))
+    volatilities = implied_volatility_of_undiscounted_price(np.array([0.5, 2]), 100, 101, 1, np.array(['p', 'p']))
+    assert np.isnan(volatilities[0])
+    assert volatilities[1] == pytest.approx(implied_volatility_of_undiscounted_price(2, 100, 101, 1, 'p'))
+
+
+def test_implied_volatility_at_intrinsic():
+    assert implied_volatility_of_undiscounted_price(10, 110, 100, 1, 'c') == 0
+    assert implied_volatility_of_undiscounted_price(1, 100, 101, 1, 'p') == 0
+
+
+def test_implied_volatility_above_maximum():
+    assert np.isnan(implied_volatility_of_undiscounted_price(101, 100, 50, 1, 'c'))
+
+
+def test_implied_volatility_deep_out_of_the_money():
+    volatilities = np.array([0.05, 0.1, 0.08, 0.3])
+    strikes = np.array([130, 170, 60, 300])
+    years_to_maturity = np.array([1, 0.5, 0.25, 0.2])
+    option_types = np.array(['c', 'c', 'p', 'c'])
+    prices = np.array([
+        GeometricBrownianMotion(v).price_black(o, 100, k, t)
+        for v, o, k, t in zip(volatilities, option_types, strikes, years_to_maturity)
+    ])
+    assert prices.max() < 1e-5
+    implied = implied_volatility_of_undiscounted_price(prices, 100, strikes, years_to_maturity, option_types)
+    np.testing.assert_allclose(implied, volatilities, rtol=1e-8)
+
+
+def test_implied_volatility_high_total_volatility():
+    spot, strike, years_to_maturity, volatility = 116.15666711575146, 115.43913567231753, 4.529142198292797, \
+        2.685582085065446
+    price = GeometricBrownianMotion(volatility).price_black('c', spot, strike, years_to_maturity)
+    assert implied_volatility_of_undiscounted_price(price, spot, strike, years_to_maturity, 'c') == pytest.approx(
+        volatility,
+        rel=1e-8
+    )
+    rng = np.random.default_rng(0)
+    size = 20000
+    volatilities = rng.uniform(0.5, 4, size)
+    spots = rng.uniform(80, 120, size)
+    strikes = spots * np.exp(rng.uniform(-0.1, 0.1, size))
+    years_to_maturity = rng.uniform(0.5, 5, size)
+    prices = np.array([
+        GeometricBrownianMotion(v).price_black('c', s, k, t)
+        for v, s, k, t in zip(volatilities, spots, strikes, years_to_maturity)
+    ])
+    implied = implied_volatility_of_undiscounted_price(prices, spots, strikes, years_to_maturity, 'c')
+    np.testing.assert_allclose(implied, volatilities, rtol=1e-8)
+
+
+def test_implied_volatility_not_converged(monkeypatch):
+    monkeypatch.setattr('vanilla_option_pricing.implied_volatility.MAX_ITERATIONS', 0)
+    assert np.isnan(implied_volatility_of_undiscounted_price(1, 100, 101, 1, 'c'))
+
+
+def test_implied_volatility_invalid_option_type():
+    for option_type in ('C', 'x'):
+        with pytest.raises(ValueError, match='option_type shall be'):
+            implied_volatility_of_undiscounted_price(2, 100, 110, 1, option_type)
+    with pytest.raises(ValueError):
+        implied_volatility_of_undiscounted_price(np.array([2, 2]), 100, 110, 1, np.array(['c', 'x']))
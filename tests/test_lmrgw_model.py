@@ -6,7 +6,7 @@ from pytest import fixture
 
 from tests.utils import check_exception_on_wrong_parameters
 from vanilla_option_pricing.models import LogMeanRevertingToGeneralisedWienerProcess, \
-    NumericalLogMeanRevertingToGeneralisedWienerProcess
+    NumericalLogMeanRevertingToGeneralisedWienerProcess, NumericalModel
 
 p_0 = np.eye(2)
 
@@ -60,9 +60,93 @@ def test_analytical_numerical_consistency():
     ts = np.linspace(10.0 / 365.0, 2, 10)
     params = list(itertools.product(ls, s_xs, s_ys))
     for l, s_x, s_y in params:
-        for t in ts:
-            lmrgw = LogMeanRevertingToGeneralisedWienerProcess(p_0, l, s_x, s_y)
-            num_lmrgw = NumericalLogMeanRevertingToGeneralisedWienerProcess(p_0, l, s_x, s_y)
-            var = lmrgw.variance(t)
-            num_var = num_lmrgw.variance(t)
-            assert var == pytest.approx(num_var, 10e-8)
+        lmrgw = LogMeanRevertingToGeneralisedWienerProcess(p_0, l, s_x, s_y)
+        num_lmrgw = NumericalLogMeanRevertingToGeneralisedWienerProcess(p_0, l, s_x, s_y)
+        var = lmrgw.variance(ts)
+        num_var = num_lmrgw.variance(ts)
+        assert var == pytest.approx(num_var, 10e-8)
+
+
+@pytest.mark.parametrize('dim', [2, 3])
+def test_numerical_model_eigendecomposition_matches_matrix_exponential(dim):
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        a = rng.normal(size=(dim, dim))
+        b = rng.normal(size=(dim, 2))
+        p = rng.normal(size=(dim, dim))
+        model = NumericalModel(a, b, p @ p.T)
+        for t in (0.01, 0.5, 2):
+            assert model.variance(t) == pytest.approx(model._variance_expm(t), rel=1e-10)
+
+
+def test_numerical_model_defective_matrix():
+    model = NumericalModel(np.array([[0, 1], [0, 0]]), np.eye(2), np.eye(2))
+    assert model.variance(1) == pytest.approx(10 / 3, rel=1e-10)
+
+
+def test_clone(model, numerical_model):
+    for original in (model, numerical_model):
+        clone = original.clone()
+        assert type(clone) == type(original)
+        assert clone.parameters == original.parameters
+        clone.p_0[0, 0] = 2
+        assert original.p_0[0, 0] == 1
+
+
+def test_numerical_model_variance_cache():
+    model = NumericalModel(np.array([[0, 1], [0, 0]]), np.eye(2), np.eye(2))
+    assert model.variance(1) is model.variance(1.0)
+    model.B = np.zeros((2, 2))
+    assert model.variance(1) == pytest.approx(2, rel=1e-10)
+
+
+def test_initial_variance_update(model):
+    assert model.variance(0) == pytest.approx(1)
+    model.p_0 = np.array([[2, 0.5], [0.5, 1]])
+    assert model.variance(0) == pytest.approx(2)
+
+
+def test_numerical_model_is_updated_in_place(model, numerical_model):
+    system = numerical_model.numerical_model
+    numerical_model.parameters = 2, 0.5, 0.1
+    model.parameters = 2, 0.5, 0.1
+    assert numerical_model.numerical_model is system
+    assert numerical_model.variance(1) == pytest.approx(model.variance(1), rel=1e-10)
+
+
+@pytest.mark.parametrize('dim', [2, 3])
+def test_numerical_model_variance_vectorized(dim):
+    rng = np.random.default_rng(1)
+    b, p = rng.normal(size=(dim, dim)), rng.normal(size=(dim, dim))
+    model = NumericalModel(rng.normal(size=(dim, dim)), b, p @ p.T)
+    ts = np.array([[0.01, 0.5], [1, 2]])
+    variances = model.variance(ts)
+    assert variances.shape == ts.shape
+    np.testing.assert_allclose(variances, [[model._variance_expm(t) for t in row] for row in ts], rtol=1e-10)
+
+
+def test_exception_on_no_mean_reversion(model):
+    with pytest.raises(ValueError, match='l must be positive'):
+        LogMeanRevertingToGeneralisedWienerProcess(p_0, 0, 1, 1)
+    with pytest.raises(ValueError, match='l must be positive'):
+        model.parameters = 0, 2, 0.1
+    assert model.parameters == (1, 1, 0.05)
+    assert model.variance(1) == pytest.approx(0.967664270613846, abs=10e-4)
+
+
+def test_numerical_model_follows_initial_variance(model, numerical_model):
+    for m in (model, numerical_model):
+        m.p_0 = 2 * np.eye(2)
+        m.parameters = 1, 1, 1
+    assert numerical_model.variance(1) == pytest.approx(1.6702, abs=1e-4)
+    assert numerical_model.variance(1) == pytest.approx(model.variance(1), rel=1e-10)
+
+
+def test_round_off_negative_variance():
+    model = LogMeanRevertingToGeneralisedWienerProcess(
+        np.zeros((2, 2)), 0.0009675904811361791, 0.0636660753100485, 25.43039614108461
+    )
+    t = 3.098889856278812e-10
+    assert model.variance(t) < 0
+    assert np.isnan(model.standard_deviation(t))
+    assert np.isnan(model.volatility(t))
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from datetime import datetime, timedelta
 
 import numpy as np
@@ -55,3 +56,58 @@ def test_exception_on_illegal_parameters():
         {'p_0': 1, 'l': 1, 's': 1},
         (1, -1)
     )
+
+
+def test_black_vectorized(model, option):
+    prices = model.price_black_vectorized(
+        ['c', 'p'],
+        np.array([option.spot, option.spot]),
+        np.array([option.strike, option.strike]),
+        np.array([option.years_to_maturity, option.years_to_maturity])
+    )
+    assert prices[0] == pytest.approx(model.price_option_black(option), abs=1e-8)
+    assert prices[1] == pytest.approx(prices[0] - option.spot + option.strike, abs=1e-8)
+
+
+def test_variance_vectorized(model):
+    ts = np.array([0.5, 1, 2])
+    np.testing.assert_allclose(model.variance(ts), [model.variance(t) for t in ts], rtol=1e-14)
+
+
+def test_black_scholes_merton_many_options(model, option):
+    options = [
+        option,
+        replace(option, option_type='p'),
+        replace(option, strike=2, dividend=0),
+        replace(option, maturity=option.maturity + timedelta(days=100))
+    ]
+    prices = model.price_options_black_scholes_merton(options, 0.05)
+    for price, o in zip(prices, options):
+        assert price == pytest.approx(model.price_option_black_scholes_merton(o, 0.05), abs=1e-10)
+
+
+def test_black_many_options(model, option):
+    options = [option, replace(option, option_type='p'), replace(option, strike=2)]
+    prices = model.price_options_black(options)
+    for price, o in zip(prices, options):
+        assert price == pytest.approx(model.price_option_black(o), abs=1e-10)
+
+
+def test_volatility_vectorized(model):
+    ts = np.array([0.5, 1, 2])
+    np.testing.assert_allclose(model.volatility(ts), [model.volatility(t) for t in ts], rtol=1e-14)
+    np.testing.assert_allclose(model.standard_deviation(ts), [model.standard_deviation(t) for t in ts], rtol=1e-14)
+
+
+def test_volatility_at_time_zero():
+    assert np.isnan(OrnsteinUhlenbeck(0, 1, 1).volatility(0))
+    assert OrnsteinUhlenbeck(1, 1, 1).volatility(0) == np.inf
+
+
+def test_exception_on_no_mean_reversion(model):
+    with pytest.raises(ValueError, match='l must be positive'):
+        OrnsteinUhlenbeck(1, 0, 1)
+    with pytest.raises(ValueError, match='l must be positive'):
+        model.parameters = 0, 2
+    assert model.parameters == (1, 1)
+    assert model.variance(1) == pytest.approx(0.5676676416183064, abs=1e-4)
@@ -1,11 +1,13 @@
+from dataclasses import FrozenInstanceError, replace
 from datetime import datetime, timedelta
+import pickle
 
 import numpy as np
 import pytest
 from pytest import fixture
 
-from vanilla_option_pricing.option import VanillaOption, option_list_to_pandas_dataframe, \
-    pandas_dataframe_to_option_list
+from vanilla_option_pricing.option import VanillaOption, VanillaOptionArrays, option_list_to_pandas_dataframe, \
+    pandas_dataframe_to_option_list, option_type_signs, implied_volatilities_of_undiscounted_prices
 
 
 @fixture
@@ -54,10 +56,8 @@ def test_to_dict(option: VanillaOption):
 
 
 def test_error_on_invalid_option_type(option: VanillaOption):
-    option.option_type = 'x'
-    with pytest.raises(ValueError) as err:
-        _ = option.implied_volatility_of_undiscounted_price
-        assert 'option_type shall be' in err.value
+    with pytest.raises(ValueError, match='option_type shall be'):
+        replace(option, option_type='x')
 
 
 def test_option_list_to_pandas_dataframe(option_list):
@@ -74,3 +74,96 @@ def test_pandas_dataframe_to_option_list(option_list):
         assert type(options[i]) == VanillaOption
     assert options[0].instrument == 'miao'
     assert options[1].instrument == 'bau'
+
+
+def test_option_is_immutable(option: VanillaOption):
+    with pytest.raises(FrozenInstanceError):
+        option.price = 2
+
+
+def test_option_type_is_lowercase():
+    option = VanillaOption('TTF', 'C', datetime.today(), 1, 100, 100, datetime.today())
+    assert option.option_type == 'c'
+
+
+def test_pandas_dataframe_to_option_list_without_optional_columns(option_list):
+    data_frame = option_list_to_pandas_dataframe(option_list).drop(columns='dividend')
+    options = pandas_dataframe_to_option_list(data_frame)
+    assert [o.dividend for o in options] == [0, 0]
+    assert [o.spot for o in options] == [100, 200]
+
+
+def test_implied_volatility_is_cached(option: VanillaOption):
+    volatility = option.implied_volatility_of_undiscounted_price
+    assert option._implied_volatility == volatility
+    assert option.implied_volatility_of_undiscounted_price is volatility
+    assert replace(option, price=2).implied_volatility_of_undiscounted_price > volatility
+
+
+def test_years_to_maturity_follows_replace(option: VanillaOption):
+    later = replace(option, maturity=option.maturity + timedelta(days=30))
+    assert later.years_to_maturity == pytest.approx(2 * option.years_to_maturity)
+
+
+def test_pandas_dataframe_to_option_list_parses_dates(option_list):
+    data_frame = option_list_to_pandas_dataframe(option_list)
+    data_frame['date'] = ['13/02/2017', '14/02/2017']
+    data_frame['maturity'] = ['01/04/2017', '01/03/2017']
+    options = pandas_dataframe_to_option_list(data_frame, dayfirst=True)
+    assert options[0].date == datetime(2017, 2, 13)
+    assert options[1].maturity == datetime(2017, 3, 1)
+    assert options[1].years_to_maturity == 15 / VanillaOption.DAYS_IN_YEAR
+
+
+def test_option_arrays(option_list):
+    arrays = VanillaOptionArrays.from_options(option_list)
+    assert len(arrays) == 2
+    np.testing.assert_array_equal(arrays.spots, [100, 200])
+    np.testing.assert_array_equal(arrays.signs, [1 if o.option_type == 'c' else -1 for o in option_list])
+    np.testing.assert_array_equal(arrays.unique_years_to_maturity, [0])
+    np.testing.assert_array_equal(arrays.maturity_indices, [0, 0])
+
+
+def test_option_arrays_comparison(option_list):
+    arrays = VanillaOptionArrays.from_options(option_list)
+    assert arrays == arrays
+    assert arrays != VanillaOptionArrays.from_options(option_list)
+    assert len({arrays}) == 1
+
+
+def test_option_arrays_to_matrix(option_list):
+    matrix = VanillaOptionArrays.from_options(option_list).to_matrix()
+    assert matrix.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(matrix, [[1, 100, 100, 0, 1], [2, 200, 200, 0, 2]])
+
+
+def test_sign(option: VanillaOption):
+    assert option.sign == 1
+    assert replace(option, option_type='P').sign == -1
+
+
+def test_option_type_signs():
+    np.testing.assert_array_equal(option_type_signs(['c', 'p', 'c']), [1, -1, 1])
+    assert option_type_signs([]).shape == (0,)
+    with pytest.raises(ValueError):
+        option_type_signs(['c', 'x'])
+
+
+def test_option_has_slots(option: VanillaOption):
+    assert not hasattr(option, '__dict__')
+    with pytest.raises(FrozenInstanceError):
+        option.other = 1
+    volatility = option.implied_volatility_of_undiscounted_price
+    unpickled = pickle.loads(pickle.dumps(option))
+    assert unpickled == option
+    assert unpickled.years_to_maturity == option.years_to_maturity
+    assert unpickled.implied_volatility_of_undiscounted_price == volatility
+
+
+def test_implied_volatilities_of_many_options(option: VanillaOption):
+    options = [option, replace(option, option_type='p', price=2), replace(option, strike=90, price=11)]
+    volatilities = implied_volatilities_of_undiscounted_prices(options)
+    for option, volatility in zip(options, volatilities):
+        assert option._implied_volatility == volatility
+        assert replace(option).implied_volatility_of_undiscounted_price == pytest.approx(volatility, rel=1e-10)
+    assert implied_volatilities_of_undiscounted_prices([]).shape == (0,)
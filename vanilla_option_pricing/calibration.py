@@ -1,11 +1,12 @@
-import copy
+from collections import OrderedDict
 from typing import Tuple, List, Sequence, Union, Dict, Callable
 
 import numpy as np
-from scipy.optimize import minimize, OptimizeResult
+from scipy.optimize import minimize, least_squares, OptimizeResult
 
-from vanilla_option_pricing.option import VanillaOption
-from vanilla_option_pricing.option_pricing import OptionPricingModel
+from vanilla_option_pricing.option import VanillaOption, VanillaOptionArrays
+from vanilla_option_pricing.option_pricing import OptionPricingModel, _chunked_undiscounted_black, \
+    _undiscounted_black_vega
 
 
 class ModelCalibration:
@@ -16,45 +17,169 @@ class ModelCalibration:
     """
 
     DEFAULT_PARAMETER_LOWER_BOUND = 1e-4
+    """Optimization algorithm used when none is specified"""
+    DEFAULT_METHOD = 'L-BFGS-B'
+    """Options of the :attr:`~DEFAULT_METHOD`, user-specified options take precedence"""
+    DEFAULT_OPTIONS = {'ftol': 1e-10, 'gtol': 1e-8, 'maxiter': 200}
+    """Number of loss evaluations remembered during a calibration"""
+    LOSS_CACHE_SIZE = 64
+
+    _GRADIENT_BASED_METHODS = ('cg', 'bfgs', 'newton-cg', 'l-bfgs-b', 'tnc', 'slsqp', 'dogleg', 'trust-ncg',
+                               'trust-krylov', 'trust-exact', 'trust-constr')
 
     def __init__(self, options: List[VanillaOption]):
         self.options = options
+        self._arrays = VanillaOptionArrays.from_options(options)
+        self._log_moneyness = np.log(self._arrays.spots / self._arrays.strikes)
 
     def calibrate_model(
             self,
             model: OptionPricingModel,
             method: str = None,
             options: Dict = None,
-            bounds: Union[str, Sequence[Tuple[float, float]]] = 'default'
+            bounds: Union[str, Sequence[Tuple[float, float]]] = 'default',
+            previous_result: OptimizeResult = None
     ) -> Tuple[OptimizeResult, OptionPricingModel]:
         """
         Tune model parameters and returns a tuned model. The algorithm tries to minimize the squared difference
         between the prices of listed options and the prices predicted by the model: the parameters of the model
         are the optimization variables.
-        The numerical optimization is performed by :func:`~scipy.optimize.minimize` in the scipy package.
+        The numerical optimization is performed by :func:`~scipy.optimize.minimize` in the scipy package,
+        which is given the analytical gradient of the loss.
 
         :param model: the model to calibrate
-        :param method: see :func:`~scipy.optimize.minimize`
-        :param options: see :func:`~scipy.optimize.minimize`
+        :param method: see :func:`~scipy.optimize.minimize`. If none is specified, :attr:`~DEFAULT_METHOD` is used
+        :param options: see :func:`~scipy.optimize.minimize`. When the :attr:`~DEFAULT_METHOD` is used, these options
+                        are merged with the :attr:`~DEFAULT_OPTIONS`
         :param bounds: the bounds to apply to parameters. If none is specified, then the
                        :attr:`~DEFAULT_PARAMETER_LOWER_BOUND` is applied for all the parameters.
                        Otherwise, a list of tuples (lower_bound, upper_bound) for each parameter shall be specified.
+        :param previous_result: the result of a previous calibration, whose parameters are used as the starting
+                                point of the optimization instead of the current parameters of the model. Useful
+                                when the same model is calibrated repeatedly, e.g. on rolling windows
         :return: a tuple (res, model), where res is the result of :func:`~scipy.optimize.minimize`,
                  while model a calibrated model
         """
-        if bounds == 'default':
-            bounds = ((self.DEFAULT_PARAMETER_LOWER_BOUND, None),) * len(model.parameters)
-        new_model = copy.deepcopy(model)
-        loss = self._get_loss_function(new_model)
-        res = minimize(loss, np.array(new_model.parameters), bounds=bounds, method=method, options=options)
+        if method is None:
+            method = self.DEFAULT_METHOD
+            options = {**self.DEFAULT_OPTIONS, **(options or {})}
+        bounds = self._get_bounds(model, bounds)
+        new_model = model.clone()
+        use_gradient = self._uses_gradient(method)
+        loss = self._get_loss_function(new_model, use_gradient)
+        res = minimize(loss, self._get_initial_parameters(new_model, previous_result), bounds=bounds, method=method,
+                       options=options, jac=use_gradient)
         new_model.parameters = res.x
         return res, new_model
 
-    def _get_loss_function(self, model: OptionPricingModel) -> Callable[[Sequence[float]], float]:
-        def _loss_function(parameters: Sequence[float]) -> float:
-            model.parameters = parameters
-            predicted_prices = np.array([model.price_option_black(o) for o in self.options])
-            real_prices = np.array([o.price for o in self.options])
-            return ((predicted_prices - real_prices) ** 2).sum()
+    def calibrate_model_least_squares(
+            self,
+            model: OptionPricingModel,
+            method: str = 'trf',
+            options: Dict = None,
+            bounds: Union[str, Sequence[Tuple[float, float]]] = 'default',
+            previous_result: OptimizeResult = None
+    ) -> Tuple[OptimizeResult, OptionPricingModel]:
+        """
+        Same as :func:`~calibration.ModelCalibration.calibrate_model`, but the optimization is performed by
+        :func:`~scipy.optimize.least_squares`, which exploits the structure of the problem and is given
+        the analytical Jacobian of the pricing errors. This usually requires fewer evaluations of the model.
+
+        :param model: the model to calibrate
+        :param method: see :func:`~scipy.optimize.least_squares`
+        :param options: additional keyword arguments for :func:`~scipy.optimize.least_squares`
+        :param bounds: same as in :func:`~calibration.ModelCalibration.calibrate_model`
+        :param previous_result: same as in :func:`~calibration.ModelCalibration.calibrate_model`
+        :return: a tuple (res, model), where res is the result of :func:`~scipy.optimize.least_squares`,
+                 while model a calibrated model
+        """
+        bounds = self._get_bounds(model, bounds)
+        if bounds is None:
+            bounds = ((None, None),) * len(model.parameters)
+        lower_bounds = [-np.inf if low is None else low for low, _ in bounds]
+        upper_bounds = [np.inf if high is None else high for _, high in bounds]
+        new_model = model.clone()
+        evaluate = self._get_cached_evaluation(new_model)
+        res = least_squares(
+            lambda p: evaluate(p, False)[0],
+            self._get_initial_parameters(new_model, previous_result),
+            jac=lambda p: evaluate(p, True)[1],
+            bounds=(lower_bounds, upper_bounds),
+            method=method,
+            **(options or {})
+        )
+        new_model.parameters = res.x
+        return res, new_model
+
+    @classmethod
+    def _uses_gradient(cls, method: Union[str, Callable]) -> bool:
+        # the methods of scipy are listed by their use of the gradient, so that any gradient-free method,
+        # e.g. a newly added one, is not given a gradient it would ignore; custom minimizers always receive it
+        return callable(method) or method.lower() in cls._GRADIENT_BASED_METHODS
+
+    @staticmethod
+    def _get_initial_parameters(model: OptionPricingModel, previous_result: OptimizeResult = None) -> np.ndarray:
+        if previous_result is not None:
+            return np.array(previous_result.x, dtype=np.float64)
+        return np.array(model.parameters, dtype=np.float64)
+
+    def _get_bounds(self, model: OptionPricingModel, bounds: Union[str, Sequence[Tuple[float, float]]]):
+        if bounds == 'default':
+            return ((self.DEFAULT_PARAMETER_LOWER_BOUND, None),) * len(model.parameters)
+        return bounds
+
+    def _get_loss_function(self, model: OptionPricingModel, with_gradient: bool = False) -> Callable:
+        evaluate = self._get_cached_evaluation(model)
+
+        def _loss_function(parameters: Sequence[float]) -> Union[float, Tuple[float, np.ndarray]]:
+            residuals, jacobian = evaluate(parameters, with_gradient)
+            loss = float(residuals @ residuals)
+            if with_gradient:
+                return loss, 2 * jacobian.T @ residuals
+            return loss
 
         return _loss_function
+
+    def _get_cached_evaluation(
+            self,
+            model: OptionPricingModel
+    ) -> Callable[[Sequence[float], bool], Tuple[np.ndarray, np.ndarray]]:
+        cache = OrderedDict()
+        # everything the loss needs is bound to local variables once, so that each evaluation
+        # runs without attribute lookups on the calibration object or on the model
+        cache_size = self.LOSS_CACHE_SIZE
+        arrays = self._arrays
+        signs, spots, strikes = arrays.signs, arrays.spots, arrays.strikes
+        log_moneyness, prices = self._log_moneyness, arrays.prices
+        # the model is evaluated once for each distinct maturity
+        maturities, maturity_indices = arrays.unique_years_to_maturity, arrays.maturity_indices
+        set_parameters = model._set_parameters_unchecked
+        standard_deviation = model.standard_deviation
+        variance_gradient = model.variance_gradient
+
+        def _evaluate(parameters: Sequence[float], with_jacobian: bool) -> Tuple[np.ndarray, np.ndarray]:
+            key = np.asarray(parameters, dtype=float).tobytes()
+            residuals, jacobian = cache.get(key, (None, None))
+            if residuals is not None and (jacobian is not None or not with_jacobian):
+                cache.move_to_end(key)
+                return residuals, jacobian
+            set_parameters(parameters)
+            standard_deviations = standard_deviation(maturities)[maturity_indices]
+            residuals = _chunked_undiscounted_black(signs, spots, strikes, log_moneyness, standard_deviations)
+            residuals -= prices
+            if with_jacobian:
+                # options whose standard deviation is zero, e.g. at expiry, get a zero row instead of inf or nan
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    vega_per_variance = np.where(
+                        standard_deviations > 0,
+                        _undiscounted_black_vega(spots, log_moneyness, standard_deviations) /
+                        (2 * standard_deviations),
+                        0.0
+                    )
+                jacobian = vega_per_variance[:, None] * variance_gradient(maturities)[:, maturity_indices].T
+            cache[key] = residuals, jacobian
+            if len(cache) > cache_size:
+                cache.popitem(last=False)
+            return residuals, jacobian
+
+        return _evaluate
@@ -0,0 +1,171 @@
+from typing import Tuple, Union
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+from vanilla_option_pricing.option_type import option_type_signs
+
+"""Relative tolerance on the normalized volatility at which iterations stop"""
+TOLERANCE = 1e-12
+"""Maximum number of iterations of the root finder"""
+MAX_ITERATIONS = 100
+
+_ONE_OVER_SQRT_TWO_PI = 1 / np.sqrt(2 * np.pi)
+_DEEP_OUT_OF_THE_MONEY_RATIO = 1e-2
+_MAX_BRACKET_EXPANSIONS = 64
+# prices below the intrinsic value by less than this fraction of sqrt(spot * strike) are attributed to rounding errors
+_BELOW_INTRINSIC_VALUE_TOLERANCE = 1e-12
+
+
+def implied_volatility_of_undiscounted_price(
+        price: Union[float, np.ndarray],
+        spot: Union[float, np.ndarray],
+        strike: Union[float, np.ndarray],
+        years_to_maturity: Union[float, np.ndarray],
+        option_type: Union[str, np.ndarray]
+) -> Union[float, np.ndarray]:
+    """
+    The implied volatility of options, considering undiscounted prices. All the arguments may be either
+    scalars or numpy arrays of the same length, in which case one volatility for each option is returned.
+
+    The problem is solved in the normalized coordinates described in P. Jäckel, *Let's be rational* (2015),
+    with a third-order Householder iteration started at the inflection point of the normalized Black
+    function, or at an asymptotic estimate for deep out-of-the-money options. Returns zero if the price
+    equals the intrinsic value of the option, and NaN if no volatility can explain it, that is if it is below
+    the intrinsic value or above the maximum attainable price. Such prices never enter the solver.
+    NaN is also returned if the iterations do not converge within :attr:`~MAX_ITERATIONS`.
+
+    :param price: option prices
+    :param spot: spot prices of the underlying
+    :param strike: option strike prices
+    :param years_to_maturity: the years remaining before maturity - as decimal numbers
+    :param option_type: types of the options (c for call, p for put), a ValueError is raised for any other type
+    :return: the implied volatilities
+    """
+    return _implied_volatility(price, spot, strike, years_to_maturity, option_type_signs(option_type))
+
+
+def _implied_volatility(
+        price: Union[float, np.ndarray],
+        spot: Union[float, np.ndarray],
+        strike: Union[float, np.ndarray],
+        years_to_maturity: Union[float, np.ndarray],
+        theta: Union[float, np.ndarray]
+) -> Union[float, np.ndarray]:
+    # same as implied_volatility_of_undiscounted_price, with theta = 1 for calls and -1 for puts
+    spot = np.asarray(spot, dtype=float)
+    strike = np.asarray(strike, dtype=float)
+    # in-the-money options are mapped to out-of-the-money ones via put-call parity, which avoids
+    # cancellation errors when evaluating the normalized Black function
+    intrinsic_value = theta * (spot - strike)
+    in_the_money = intrinsic_value > 0
+    price = np.where(in_the_money, np.asarray(price, dtype=float) - intrinsic_value, price)
+    theta = np.where(in_the_money, -theta, theta)
+    x = np.log(spot / strike)
+    beta = price / np.sqrt(spot * strike)
+    x, beta, theta = np.broadcast_arrays(x, beta, theta)
+    s = _normalized_implied_volatility(np.ravel(x), np.ravel(beta), np.ravel(theta)).reshape(x.shape)
+    volatility = s / np.sqrt(years_to_maturity)
+    return volatility if np.ndim(volatility) else float(volatility)
+
+
+def _normalized_black(x: np.ndarray, s: np.ndarray, theta: np.ndarray,
+                      exp_half_x: np.ndarray, exp_minus_half_x: np.ndarray) -> np.ndarray:
+    # exp(x / 2) and exp(-x / 2) do not depend on s, so they are computed once by the caller
+    return _normalized_black_terms(x / s, 0.5 * s, theta, exp_half_x, exp_minus_half_x)
+
+
+def _normalized_black_terms(x_over_s: np.ndarray, half_s: np.ndarray, theta: np.ndarray,
+                            exp_half_x: np.ndarray, exp_minus_half_x: np.ndarray) -> np.ndarray:
+    return theta * (exp_half_x * ndtr(theta * (x_over_s + half_s)) -
+                    exp_minus_half_x * ndtr(theta * (x_over_s - half_s)))
+
+
+def _normalized_black_and_vega(x: np.ndarray, s: np.ndarray, theta: np.ndarray, exp_half_x: np.ndarray,
+                               exp_minus_half_x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # the normalized Black function and its derivative with respect to s, which share x / s and s / 2.
+    # The derivative is phi(d1) * exp(x / 2), that is a single exponential of -(x^2 / s^2 + s^2 / 4) / 2.
+    # The squared ratio x^2 / s^2 is returned too, as the higher order terms of the iteration need it
+    x_over_s = x / s
+    half_s = 0.5 * s
+    x2_over_s2 = x_over_s * x_over_s
+    price = _normalized_black_terms(x_over_s, half_s, theta, exp_half_x, exp_minus_half_x)
+    vega = _ONE_OVER_SQRT_TWO_PI * np.exp(-0.5 * (x2_over_s2 + half_s * half_s))
+    return price, vega, x2_over_s2
+
+
+def _normalized_implied_volatility(x: np.ndarray, beta: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    # options are assumed to be out-of-the-money, that is theta * x <= 0
+    s = np.zeros_like(beta)
+    s[(beta < -_BELOW_INTRINSIC_VALUE_TOLERANCE) | (beta >= np.exp(-0.5 * np.abs(x)))] = np.nan
+    active = np.flatnonzero((beta > 0) & ~np.isnan(s))
+    x, beta, theta = x[active], beta[active], theta[active]
+    # quantities which only depend on the option, and not on the volatility, are computed before iterating
+    exp_half_x = np.exp(0.5 * x)
+    exp_minus_half_x = 1 / exp_half_x
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # the normalized Black function increases with s, so its value at the inflection point
+        # tells on which side of it the solution lies
+        inflection = np.sqrt(2 * np.abs(x))
+        inflection_price = _normalized_black(x, inflection, theta, exp_half_x, exp_minus_half_x)
+        lower = beta < inflection_price
+        # far below the inflection point, iterations started there would creep down the steep exponential
+        # tail, so they start from the leading term of the asymptotic expansion, beta ~ exp(-x^2 / (2 s^2))
+        guess = np.where(
+            beta < _DEEP_OUT_OF_THE_MONEY_RATIO * inflection_price,
+            np.abs(x) / np.sqrt(-2 * np.log(beta)),
+            inflection
+        )
+        guess = np.where(x == 0, beta / _ONE_OVER_SQRT_TWO_PI, guess)
+        # above the inflection point the function flattens towards its supremum exp(-|x| / 2), and the distance
+        # from it is about (exp(x / 2) + exp(-x / 2)) * N(-s / 2) for large s
+        upper_guess = -2 * ndtri((np.exp(-0.5 * np.abs(x)) - beta) / (exp_half_x + exp_minus_half_x))
+        guess = np.where(lower | ~(upper_guess > inflection), guess, upper_guess)
+        low = np.where(lower, 0, inflection)
+        high = _upper_bracket(x, beta, theta, exp_half_x, exp_minus_half_x, np.where(lower, inflection, 2 * guess))
+        for _ in range(MAX_ITERATIONS):
+            if active.size == 0:
+                break
+            price, vega, x2_over_s2 = _normalized_black_and_vega(x, guess, theta, exp_half_x, exp_minus_half_x)
+            difference = price - beta
+            low = np.where(difference < 0, guess, low)
+            high = np.where(difference > 0, guess, high)
+            nu = -difference / vega
+            h2 = x2_over_s2 / guess - 0.25 * guess
+            h3 = h2 * h2 - 3 * x2_over_s2 / (guess * guess) - 0.25
+            step = nu * (1 + 0.5 * h2 * nu) / (1 + h2 * nu + h3 * nu * nu / 6)
+            new_guess = guess + step
+            # convergence is checked before the bracket, as a step below the resolution of floating point
+            # numbers may land exactly on one of its ends
+            converged = (difference == 0) | (np.abs(step) <= TOLERANCE * guess)
+            new_guess = np.where(difference == 0, guess, new_guess)
+            out_of_bracket = ~converged & ~((new_guess > low) & (new_guess < high))
+            new_guess = np.where(out_of_bracket, 0.5 * (low + high), new_guess)
+            s[active[converged]] = new_guess[converged]
+            keep = ~converged
+            active, x, beta, theta = active[keep], x[keep], beta[keep], theta[keep]
+            exp_half_x, exp_minus_half_x = exp_half_x[keep], exp_minus_half_x[keep]
+            guess, low, high = new_guess[keep], low[keep], high[keep]
+
+    # the solution is not returned unless the iterations converged
+    s[active] = np.nan
+    return s
+
+
+def _upper_bracket(x: np.ndarray, beta: np.ndarray, theta: np.ndarray, exp_half_x: np.ndarray,
+                   exp_minus_half_x: np.ndarray, high: np.ndarray) -> np.ndarray:
+    # doubles the candidate upper ends until the normalized Black function exceeds beta there, so that
+    # the iterations always run inside a finite bracket. Ends which cannot be found are left infinite
+    pending = np.flatnonzero(~(_normalized_black(x, high, theta, exp_half_x, exp_minus_half_x) > beta))
+    high = high.copy()
+    for _ in range(_MAX_BRACKET_EXPANSIONS):
+        if pending.size == 0:
+            return high
+        high[pending] *= 2
+        above = _normalized_black(
+            x[pending], high[pending], theta[pending], exp_half_x[pending], exp_minus_half_x[pending]
+        ) > beta[pending]
+        pending = pending[~above]
+    high[pending] = np.inf
+    return high
@@ -1,7 +1,9 @@
-from typing import Tuple
+import cmath
+import math
+from collections import OrderedDict
+from typing import Tuple, Optional, List, Union
 
 import numpy as np
-from scipy import linalg as la
 
 from vanilla_option_pricing.option_pricing import OptionPricingModel
 
@@ -13,17 +15,37 @@ class LogMeanRevertingToGeneralisedWienerProcess(OptionPricingModel):
     is modelled by an Ornstein-Uhlenbeck process.
 
     :param p_0: the initial variance, that is the variance of the state at time t=0. Must be a 2x2 numpy array
-    :param l: the strength of mean-reversion, must be non-negative
+    :param l: the strength of mean-reversion, must be positive
     :param s_x: volatility of the long-term process, must be non-negative
     :param s_y: volatility of the short-term process, must be non-negative
     """
 
     name = 'Log Mean-Reverting To Generalised Wiener Process'
+    __slots__ = ('_p_0', '_p_00', '_p_10', '_p_11', 'l', 's_x', 's_y', '_s_y2', '_c_2l', '_c_l', '_c_0')
 
     def __init__(self, p_0: np.array, l: float, s_x: float, s_y: float):
-        self.p_0 = p_0
+        self._store_p_0(p_0)
         self.parameters = l, s_x, s_y
 
+    @property
+    def p_0(self) -> np.array:
+        """
+        The initial variance of the state
+        """
+        return self._p_0
+
+    @p_0.setter
+    def p_0(self, value: np.array):
+        self._store_p_0(value)
+        self._update_constants(self.l, self.s_x, self.s_y)
+
+    def _store_p_0(self, value: np.array):
+        # the entries are also kept as plain floats, which are faster to read than array elements
+        self._p_0 = value
+        self._p_00 = float(value[0, 0])
+        self._p_10 = float(value[1, 0])
+        self._p_11 = float(value[1, 1])
+
     @property
     def parameters(self) -> Tuple[float, float, float]:
         """
@@ -37,22 +59,70 @@ class LogMeanRevertingToGeneralisedWienerProcess(OptionPricingModel):
             value,
             'l, s_x, s_y must be non-negative'
         )
-        self.l = value[0]
-        self.s_x = value[1]
-        self.s_y = value[2]
-
-    def variance(self, t: float) -> float:
+        super(LogMeanRevertingToGeneralisedWienerProcess, self)._check_strict_positivity(
+            value[:1],
+            'l must be positive'
+        )
+        self._set_parameters_unchecked(value)
+
+    def _set_parameters_unchecked(self, value: Tuple[float, float, float]):
+        l, s_x, s_y = value
+        self._update_constants(l, s_x, s_y)
+
+    def _update_constants(self, l: float, s_x: float, s_y: float):
+        # the variance is c_2l * exp(-2lt) + c_l * exp(-lt) + s_y^2 * t + c_0, where the coefficients
+        # only depend on the parameters and on p_0. They are computed before any attribute is assigned,
+        # so that a failure leaves the model unchanged
+        p_00, p_10, p_11 = self._p_00, self._p_10, self._p_11
+        s_x2, s_y2, two_l = s_x * s_x, s_y * s_y, 2 * l
+        c_2l = p_00 - 2 * p_10 + p_11 - (s_x2 + s_y2) / two_l
+        c_l = 2 * (p_10 - p_11 + s_y2 / l)
+        c_0 = (s_x2 - 3 * s_y2) / two_l + p_11
+        self.l, self.s_x, self.s_y = l, s_x, s_y
+        self._s_y2, self._c_2l, self._c_l, self._c_0 = s_y2, c_2l, c_l, c_0
+
+    def clone(self) -> 'LogMeanRevertingToGeneralisedWienerProcess':
+        if type(self) is not LogMeanRevertingToGeneralisedWienerProcess:
+            # a subclass may take other constructor arguments or hold more state: deep-copy it instead
+            return super().clone()
+        return LogMeanRevertingToGeneralisedWienerProcess(np.array(self.p_0), self.l, self.s_x, self.s_y)
+
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
-        The variance of the model output at a given time instant
+        The variance of the model output at a given time instant, or at many instants at once
 
-        :param t: the time when the variance is evaluated
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
         :return: the variance at time t
         """
-        first_term = (self.p_0[0, 0] - 2 * self.p_0[1, 0] + self.p_0[1, 1] - (self.s_x ** 2 + self.s_y ** 2) / (
-                2 * self.l)) * np.exp(-2 * self.l * t)
-        second_term = 2 * (self.p_0[1, 0] - self.p_0[1, 1] + self.s_y ** 2 / self.l) * np.exp(-self.l * t)
-        third_term = (self.s_y ** 2) * t + (self.s_x ** 2 - 3 * (self.s_y ** 2)) / (2 * self.l) + self.p_0[1, 1]
-        return first_term + second_term + third_term
+        return _lmrgw_variance(t, self.l, self._s_y2, self._c_2l, self._c_l, self._c_0)
+
+    def variance_gradient(self, t: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        The gradient of the variance with respect to the parameters l, s_x, s_y
+
+        :param t: the time when the gradient is evaluated
+        :return: an array with the derivatives with respect to l, s_x, s_y
+        """
+        l, s_x2, s_y2 = self.l, self.s_x ** 2, self.s_y ** 2
+        exp_l = np.exp(-l * t)
+        exp_2l = np.exp(-2 * l * t)
+        d_l = ((s_x2 + s_y2) / (2 * l ** 2) - 2 * t * self._c_2l) * exp_2l + \
+              (-2 * s_y2 / l ** 2 - t * self._c_l) * exp_l - (s_x2 - 3 * s_y2) / (2 * l ** 2)
+        d_s_x = self.s_x / l * (1 - exp_2l)
+        d_s_y = self.s_y / l * (4 * exp_l - exp_2l - 3) + 2 * self.s_y * t
+        return np.array([d_l, d_s_x, d_s_y])
+
+
+def _lmrgw_variance(t: float, l: float, s_y2: float, c_2l: float, c_l: float, c_0: float) -> float:
+    exp_l = _exp(-l * t)
+    return (c_2l * exp_l + c_l) * exp_l + s_y2 * t + c_0
+
+
+def _exp(x: float) -> float:
+    # math.exp is much cheaper than np.exp on a single number
+    if isinstance(x, np.ndarray):
+        return np.exp(x)
+    return math.exp(x)
 
 
 class OrnsteinUhlenbeck(OptionPricingModel):
@@ -60,10 +130,11 @@ class OrnsteinUhlenbeck(OptionPricingModel):
     The single-factor, mean-reverting Ornstein-Uhlenbeck process.
 
     :param p_0: the initial variance, that is the variance of the state at time t=0, must be positive semidefinite and symmetric
-    :param l: the strength of the mean-reversion, must be non-negative
+    :param l: the strength of the mean-reversion, must be positive
     :param s: the volatility, must be non-negative
     """
     name = 'Ornstein-Uhlenbeck'
+    __slots__ = ('p_0', 'l', 's', '_two_l', '_s2_over_2l')
 
     def __init__(self, p_0: float, l: float, s: float):
         self.p_0 = p_0
@@ -82,17 +153,46 @@ class OrnsteinUhlenbeck(OptionPricingModel):
             value,
             'l, s must be non-negative'
         )
-        self.l = value[0]
-        self.s = value[1]
-
-    def variance(self, t: float) -> float:
+        super(OrnsteinUhlenbeck, self)._check_strict_positivity(value[:1], 'l must be positive')
+        self._set_parameters_unchecked(value)
+
+    def _set_parameters_unchecked(self, value: Tuple[float, float]):
+        # constants are computed before any attribute is assigned, so that a failure leaves the model unchanged
+        l, s = value
+        two_l = 2 * l
+        s2_over_2l = s * s / two_l
+        self.l, self.s, self._two_l, self._s2_over_2l = l, s, two_l, s2_over_2l
+
+    def clone(self) -> 'OrnsteinUhlenbeck':
+        if type(self) is not OrnsteinUhlenbeck:
+            return super().clone()
+        return OrnsteinUhlenbeck(self.p_0, self.l, self.s)
+
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
-        The variance of the model output at a given time instant
+        The variance of the model output at a given time instant, or at many instants at once
 
-        :param t: the time when the variance is evaluated
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
         :return: the variance at time t
         """
-        return self.p_0 * np.exp(-2 * self.l * t) + self.s ** 2 / (2 * self.l) * (1 - np.exp(-2 * self.l * t))
+        return _ou_variance(t, self.p_0, self._two_l, self._s2_over_2l)
+
+    def variance_gradient(self, t: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        The gradient of the variance with respect to the parameters l, s
+
+        :param t: the time when the gradient is evaluated
+        :return: an array with the derivatives with respect to l, s
+        """
+        exp_2l = np.exp(-2 * self.l * t)
+        d_l = -2 * t * self.p_0 * exp_2l + self.s ** 2 * (t * exp_2l / self.l - (1 - exp_2l) / (2 * self.l ** 2))
+        d_s = self.s / self.l * (1 - exp_2l)
+        return np.array([d_l, d_s])
+
+
+def _ou_variance(t: float, p_0: float, two_l: float, s2_over_2l: float) -> float:
+    exp_2l = _exp(-two_l * t)
+    return p_0 * exp_2l + s2_over_2l * (1 - exp_2l)
 
 
 class GeometricBrownianMotion(OptionPricingModel):
@@ -102,6 +202,7 @@ class GeometricBrownianMotion(OptionPricingModel):
     :param s: the volatility, must be non-negative
     """
     name = 'Geometric Brownian Motion'
+    __slots__ = ('s',)
 
     def __init__(self, s: float):
         self.parameters = (s,)
@@ -116,23 +217,62 @@ class GeometricBrownianMotion(OptionPricingModel):
     @parameters.setter
     def parameters(self, value: Tuple[float]):
         super(GeometricBrownianMotion, self)._check_positivity(value, 's must be non-negative')
+        self._set_parameters_unchecked(value)
+
+    def _set_parameters_unchecked(self, value: Tuple[float]):
         self.s = value[0]
 
-    def variance(self, t: float) -> float:
+    def clone(self) -> 'GeometricBrownianMotion':
+        if type(self) is not GeometricBrownianMotion:
+            return super().clone()
+        return GeometricBrownianMotion(self.s)
+
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
-        The variance of the model output at a given time instant
+        The variance of the model output at a given time instant, or at many instants at once
 
-        :param t: the time when the variance is evaluated
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
         :return: the variance at time t
         """
-        return self.s ** 2 * t
+        return self.s * self.s * t
+
+    def standard_deviation(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        The standard deviation of the model output at a given time instant, that is s * sqrt(t)
+
+        :param t: the time when the standard deviation is evaluated
+        :return: the standard deviation at time t
+        """
+        if isinstance(t, np.ndarray):
+            return abs(self.s) * np.sqrt(t)
+        return abs(self.s) * math.sqrt(t)
+
+    def volatility(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        The volatility of the model output, which is constant and equal to s
+
+        :param t: the time when the volatility is evaluated
+        :return: the volatility at time t
+        """
+        if isinstance(t, np.ndarray):
+            return np.full(t.shape, abs(self.s), dtype=float)
+        return abs(self.s)
+
+    def variance_gradient(self, t: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        The gradient of the variance with respect to the parameter s
+
+        :param t: the time when the gradient is evaluated
+        :return: an array with the derivative with respect to s
+        """
+        return np.array([2 * self.s * t])
 
 
 class NumericalLogMeanRevertingToGeneralisedWienerProcess(OptionPricingModel):
     """
     This model relies on the same stochastic process as :class:`~models.LogMeanRevertingToGeneralisedWienerProcess`,
-    but uses a numerical procedures based on a matrix exponential instead of the analytical formulas to
-    compute the variance. As this approach is considerably slower, it is strongly suggested to adopt
+    but uses the general-purpose numerical procedures of :class:`~models.NumericalModel` instead of the
+    analytical formulas to compute the variance. As this approach is considerably slower, it is strongly suggested to adopt
     :class:`~models.LogMeanRevertingToGeneralisedWienerProcess` instead, using this class only for benchmarking
 
     :param p_0: the initial variance, that is the variance of the state at time t=0. Must be a 2x2 numpy array, symmetric and positive semidefinite
@@ -142,9 +282,11 @@ class NumericalLogMeanRevertingToGeneralisedWienerProcess(OptionPricingModel):
     """
 
     name = 'Numerical Log Mean-Reverting To Generalised Wiener Process'
+    __slots__ = ('p_0', 'l', 's_x', 's_y', 'numerical_model')
 
     def __init__(self, p_0: np.array, l: float, s_x: float, s_y: float):
         self.p_0 = p_0
+        self.numerical_model = None
         self.parameters = l, s_x, s_y
 
     @property
@@ -160,25 +302,37 @@ class NumericalLogMeanRevertingToGeneralisedWienerProcess(OptionPricingModel):
             value,
             'l, s_x, s_y must be non-negative'
         )
+        self._set_parameters_unchecked(value)
+
+    def _set_parameters_unchecked(self, value: Tuple[float, float, float]):
         self.l = value[0]
         self.s_x = value[1]
         self.s_y = value[2]
-        self.numerical_model = NumericalModel(self.__get_matrix_a(), self.__get_matrix_b(), self.p_0)
-
-    def variance(self, t: float) -> float:
+        if self.numerical_model is None:
+            self.numerical_model = NumericalModel(self.__get_matrix_a(), self.__get_matrix_b(), self.p_0)
+        else:
+            # p_0 is passed too, as it may have been replaced since the system was created
+            self.numerical_model._set_matrices(self.__get_matrix_a(), self.__get_matrix_b(), self.p_0)
+
+    def clone(self) -> 'NumericalLogMeanRevertingToGeneralisedWienerProcess':
+        if type(self) is not NumericalLogMeanRevertingToGeneralisedWienerProcess:
+            return super().clone()
+        return NumericalLogMeanRevertingToGeneralisedWienerProcess(np.array(self.p_0), self.l, self.s_x, self.s_y)
+
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
-        The variance of the model output at a given time instant
+        The variance of the model output at a given time instant, or at many instants at once
 
-        :param t: the time when the variance is evaluated
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
         :return: the variance at time t
         """
         return self.numerical_model.variance(t)
 
     def __get_matrix_a(self) -> np.array:
-        return np.array([[-self.l, self.l], [0, 0]])
+        return np.array([[-self.l, self.l], [0, 0]], dtype=np.float64)
 
     def __get_matrix_b(self) -> np.array:
-        return np.array([[self.s_x, 0], [0, self.s_y]])
+        return np.array([[self.s_x, 0], [0, self.s_y]], dtype=np.float64)
 
 
 class NumericalModel:
@@ -186,28 +340,209 @@ class NumericalModel:
     A general-purpose linear stochastic system. All the parameters must be matrices (as Numpy arrays) of
     suitable dimensions.
 
+    When the dynamic matrix A is diagonalizable, its eigendecomposition is computed once, when the matrices
+    are set, and the variance is given by a closed-form expression in the eigenvalues. Otherwise, the
+    variance is computed via the matrix exponential of a block matrix. In both cases, variances are remembered
+    for the most recent time instants, as long as the matrices are not replaced.
+
     :param A: the dynamic matrix A of the system
     :param B: the input matrix B of the system
     :param p_0: the initial variance, that is the variance of the state at time t=0, must be symmetric and positive semidefinite
 
     """
 
+    __slots__ = ('_A', '_B', '_p_0', '_variance_cache', '_eigenvalue_sums', '_modal_p_0', '_modal_noise',
+                 '_output_weights', '_modal_terms')
+
+    """Eigenvector matrices with a larger condition number are considered defective"""
+    MAX_EIGENVECTORS_CONDITION_NUMBER = 1e8
+    """Number of time instants whose variance is remembered, until the matrices change"""
+    VARIANCE_CACHE_SIZE = 256
+
     def __init__(self, A: np.array, B: np.array, p_0: np.array):
-        self.A = A
-        self.B = B
-        self.p_0 = p_0
+        self._A = _as_float_matrix(A)
+        self._B = _as_float_matrix(B)
+        self._p_0 = _as_float_matrix(p_0)
+        self._prepare()
 
-    def variance(self, t: float) -> float:
+    @property
+    def A(self) -> np.array:
         """
-        The variance of the model output at a given time instant
+        The dynamic matrix A of the system
+        """
+        return self._A
+
+    @A.setter
+    def A(self, value: np.array):
+        self._A = _as_float_matrix(value)
+        self._prepare()
+
+    @property
+    def B(self) -> np.array:
+        """
+        The input matrix B of the system
+        """
+        return self._B
+
+    @B.setter
+    def B(self, value: np.array):
+        self._B = _as_float_matrix(value)
+        self._prepare()
+
+    @property
+    def p_0(self) -> np.array:
+        """
+        The initial variance of the state
+        """
+        return self._p_0
+
+    @p_0.setter
+    def p_0(self, value: np.array):
+        self._p_0 = _as_float_matrix(value)
+        self._prepare()
 
-        :param t: the time when the variance is evaluated
+    def _set_matrices(self, A: np.array, B: np.array, p_0: np.array):
+        # replaces all the matrices at once, preparing the system only one time
+        self._A = _as_float_matrix(A)
+        self._B = _as_float_matrix(B)
+        self._p_0 = _as_float_matrix(p_0)
+        self._prepare()
+
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        The variance of the model output at a given time instant, or at many instants at once
+
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
         :return: the variance at time t
         """
-        dim = self.A.shape[0]
+        if np.ndim(t) > 0:
+            if self._eigenvalue_sums is not None:
+                return self._variance_modal(np.asarray(t, dtype=float)[..., None, None])
+            return np.array([self.variance(x) for x in np.ravel(t)]).reshape(np.shape(t))
+        t = float(t)
+        variance = self._variance_cache.get(t)
+        if variance is not None:
+            self._variance_cache.move_to_end(t)
+            return variance
+        if self._eigenvalue_sums is None:
+            variance = self._variance_expm(t)
+        else:
+            variance = self._variance_modal(t)
+        self._variance_cache[t] = variance
+        if len(self._variance_cache) > self.VARIANCE_CACHE_SIZE:
+            self._variance_cache.popitem(last=False)
+        return variance
+
+    def _variance_modal(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # time instants may also be an array with two trailing unit axes, which broadcast over the modal matrices
+        if self._modal_terms is not None and np.ndim(t) == 0:
+            return _sum_modal_terms(self._modal_terms, t)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            integral = np.where(
+                self._eigenvalue_sums == 0,
+                t,
+                np.expm1(self._eigenvalue_sums * t) / self._eigenvalue_sums
+            )
+        return np.sum(self._output_weights * (np.exp(self._eigenvalue_sums * t) * self._modal_p_0 +
+                                              integral * self._modal_noise), axis=(-2, -1)).real
+
+    def _prepare(self):
+        self._variance_cache = OrderedDict()
+        # In the eigenvector basis, with A = V diag(w) V^-1, the state variance evolves independently for each
+        # pair of eigenvalues (w_k, w_l): the free response scales by exp((w_k + w_l) t), while the noise
+        # contributes the integral of the same exponential.
+        if self._A.shape == (2, 2):
+            decomposition = _eigendecomposition_2x2(self._A, self.MAX_EIGENVECTORS_CONDITION_NUMBER)
+        else:
+            decomposition = _eigendecomposition(self._A, self.MAX_EIGENVECTORS_CONDITION_NUMBER)
+        if decomposition is None:
+            self._eigenvalue_sums = None
+            return
+        eigenvalues, eigenvectors, inverse = decomposition
+        self._eigenvalue_sums = eigenvalues[:, None] + eigenvalues[None, :]
+        self._modal_p_0 = inverse @ self._p_0 @ inverse.T
+        self._modal_noise = inverse @ self._B @ self._B.T @ inverse.T
+        self._output_weights = np.outer(eigenvectors[0], eigenvectors[0])
+        # on small systems, a plain loop over Python numbers is cheaper than dispatching NumPy operations
+        self._modal_terms = None
+        if self._A.shape == (2, 2):
+            self._modal_terms = list(zip(
+                self._eigenvalue_sums.ravel().tolist(),
+                (self._output_weights * self._modal_p_0).ravel().tolist(),
+                (self._output_weights * self._modal_noise).ravel().tolist()
+            ))
+
+    def _variance_expm(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        # scipy.linalg is slow to import, and only defective systems need it
+        from scipy import linalg as la
+        dim = self._A.shape[0]
         F = la.expm(np.block([
-            [self.A, self.B @ np.transpose(self.B)],
-            [np.zeros_like(self.A), -np.transpose(self.A)]
+            [self._A, self._B @ np.transpose(self._B)],
+            [np.zeros_like(self._A), -np.transpose(self._A)]
         ]) * t)
-        P = (F[0:dim, 0:dim] @ self.p_0 + F[0:dim, dim:2 * dim]) @ la.inv(F[dim:2 * dim, dim:2 * dim])
-        return P[0, 0]
+        # only the first row of P = (F_11 p_0 + F_12) F_22^-1 is needed, which solves F_22^T x = (F_11 p_0 + F_12)[0]
+        first_row = np.linalg.solve(
+            F[dim:2 * dim, dim:2 * dim].T,
+            F[0, 0:dim] @ self._p_0 + F[0, dim:2 * dim]
+        )
+        return first_row[0]
+
+
+def _sum_modal_terms(terms: List[Tuple[complex, complex, complex]], t: float) -> float:
+    total = 0
+    for eigenvalue_sum, free_weight, noise_weight in terms:
+        if eigenvalue_sum == 0:
+            total += free_weight + noise_weight * t
+        elif isinstance(eigenvalue_sum, complex):
+            exponential = cmath.exp(eigenvalue_sum * t)
+            total += free_weight * exponential + noise_weight * (exponential - 1) / eigenvalue_sum
+        else:
+            total += free_weight * math.exp(eigenvalue_sum * t) + \
+                noise_weight * math.expm1(eigenvalue_sum * t) / eigenvalue_sum
+    return total.real
+
+
+def _as_float_matrix(value: np.array) -> np.array:
+    # contiguous float64 arrays are handed to BLAS and LAPACK without further conversions
+    return np.ascontiguousarray(value, dtype=np.float64)
+
+
+def _eigendecomposition(
+        a: np.array,
+        max_condition_number: float
+) -> Optional[Tuple[np.array, np.array, np.array]]:
+    eigenvalues, eigenvectors = np.linalg.eig(a)
+    if np.linalg.cond(eigenvectors) > max_condition_number:
+        return None
+    if not np.iscomplex(eigenvalues).any():
+        eigenvalues, eigenvectors = eigenvalues.real, eigenvectors.real
+    return eigenvalues, eigenvectors, np.linalg.inv(eigenvectors)
+
+
+def _eigendecomposition_2x2(
+        a: np.array,
+        max_condition_number: float
+) -> Optional[Tuple[np.array, np.array, np.array]]:
+    # closed-form solution of the characteristic polynomial, avoiding LAPACK calls on tiny matrices
+    (a_00, a_01), (a_10, a_11) = a.tolist()
+    half_trace = 0.5 * (a_00 + a_11)
+    discriminant = (0.5 * (a_00 - a_11)) ** 2 + a_01 * a_10
+    root = math.sqrt(discriminant) if discriminant >= 0 else cmath.sqrt(discriminant)
+    eigenvalues = (half_trace + root, half_trace - root)
+    if a_01 != 0:
+        (v_00, v_10), (v_01, v_11) = [(a_01, w - a_00) for w in eigenvalues]
+    elif a_10 != 0:
+        (v_00, v_10), (v_01, v_11) = [(w - a_11, a_10) for w in eigenvalues]
+    else:
+        eigenvalues = (a_00, a_11)
+        (v_00, v_10), (v_01, v_11) = (1, 0), (0, 1)
+    determinant = v_00 * v_11 - v_01 * v_10
+    condition_number = max(abs(v_00) + abs(v_10), abs(v_01) + abs(v_11)) * \
+        max(abs(v_00) + abs(v_01), abs(v_10) + abs(v_11))
+    if condition_number > max_condition_number * abs(determinant):
+        return None
+    return (
+        np.array(eigenvalues),
+        np.array([[v_00, v_01], [v_10, v_11]]),
+        np.array([[v_11, -v_01], [-v_10, v_00]]) / determinant
+    )
@@ -1,17 +1,49 @@
+from dataclasses import dataclass, field, fields, Field, FrozenInstanceError, MISSING
 from datetime import datetime
-from typing import List
+from operator import attrgetter
+from typing import List, Sequence, Tuple, TYPE_CHECKING
 
-import pandas as pd
-from py_lets_be_rational.exceptions import BelowIntrinsicException
-from py_vollib.black import implied_volatility as iv
+import numpy as np
 
+from vanilla_option_pricing.implied_volatility import _implied_volatility
+# re-exported, as the option type utilities used to be defined in this module
+from vanilla_option_pricing.option_type import check_option_type, option_type_signs
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _raise_frozen_instance_error(self, name: str, *args):
+    raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+
+def _with_slots(cls: type) -> type:
+    # Rebuilds a frozen dataclass with __slots__, as dataclass(slots=True) does on Python 3.10+.
+    # Defaults of init fields were already captured by the generated __init__, so they can be removed from the class
+    # body, while init=False fields must be set in __post_init__.
+    namespace = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    for name in field_names + ('__dict__', '__weakref__'):
+        namespace.pop(name, None)
+    namespace['__slots__'] = field_names
+    namespace['__setattr__'] = _raise_frozen_instance_error
+    namespace['__delattr__'] = _raise_frozen_instance_error
+    namespace['__getstate__'] = lambda self: tuple(getattr(self, name) for name in field_names)
+    namespace['__setstate__'] = lambda self, state: [
+        object.__setattr__(self, name, value) for name, value in zip(field_names, state)
+    ]
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_with_slots
+@dataclass(frozen=True)
 class VanillaOption:
     """
     A European vanilla option. All the prices must share the same currency.
+    Options are immutable: use :func:`~dataclasses.replace` to obtain a modified copy.
 
     :param instrument: name of the underlying
-    :param option_type: type of the option (c for call, p for put)
+    :param option_type: type of the option (c for call, p for put), a ValueError is raised for any other type
     :param date: the date when the option is traded
     :param price: option price
     :param strike: option strike price
@@ -20,53 +52,162 @@ class VanillaOption:
     :param dividend: underlying dividend - if any, expressed as a decimal number
     """
 
+    instrument: str
+    option_type: str
+    date: datetime
+    price: float
+    strike: float
+    spot: float
+    maturity: datetime
+    dividend: float = 0
+    _years_to_maturity: float = field(init=False, repr=False, compare=False)
+    _implied_volatility: float = field(init=False, repr=False, compare=False)
+    _sign: float = field(init=False, repr=False, compare=False)
+
     """Number of days in a year"""
     DAYS_IN_YEAR = 365.2425
 
-    def __init__(self, instrument: str, option_type: str, date: datetime, price: float, strike: float, spot: float,
-                 maturity: datetime, dividend=0):
-        self.instrument = instrument
-        self.option_type = option_type.lower()
-        self.date = date
-        self.price = price
-        self.strike = strike
-        self.spot = spot
-        self.maturity = maturity
-        self.dividend = dividend
+    def __post_init__(self):
+        option_type = self.option_type.lower()
+        check_option_type(option_type)
+        object.__setattr__(self, 'option_type', option_type)
+        object.__setattr__(self, '_sign', 1.0 if option_type == 'c' else -1.0)
+        object.__setattr__(self, '_years_to_maturity', (self.maturity - self.date).days / self.DAYS_IN_YEAR)
+        object.__setattr__(self, '_implied_volatility', None)
 
     @property
     def years_to_maturity(self) -> float:
         """
         The years remaining to option maturity, as a decimal number.
+        As options are immutable, it is computed only once, when the option is created.
         """
-        return (self.maturity - self.date).days / self.DAYS_IN_YEAR
+        return self._years_to_maturity
+
+    @property
+    def sign(self) -> float:
+        """
+        The type of the option encoded as a number, 1 for calls and -1 for puts, so that pricing formulae
+        can be written without branches. It is computed only once, when the option is created.
+        """
+        return self._sign
 
     @property
     def implied_volatility_of_undiscounted_price(self) -> float:
         """
         The implied volatility of the option, considering an undiscounted price.
-        Returns zero if the implied volatility is negative.
+        Returns zero if the price equals the intrinsic value of the option, and NaN if it is below.
+        As options are immutable, it is computed only on first access.
         """
-        check_option_type(self.option_type)
-        try:
-            return iv.implied_volatility_of_undiscounted_option_price(
+        if self._implied_volatility is None:
+            object.__setattr__(self, '_implied_volatility', _implied_volatility(
                 self.price,
                 self.spot,
                 self.strike,
                 self.years_to_maturity,
-                self.option_type
-            )
-        except BelowIntrinsicException:
-            return 0
+                self._sign
+            ))
+        return self._implied_volatility
 
     def to_dict(self):
         """
         :return: all the fields of the object in a dictionary
         """
-        return vars(self)
+        return {name: getattr(self, name) for name in _CONSTRUCTOR_FIELD_NAMES}
+
+
+@dataclass(frozen=True, eq=False)
+class VanillaOptionArrays:
+    """
+    The data of a collection of :class:`~option.VanillaOption`, stored column-wise in numpy arrays, one element
+    for each option. Building it once avoids reading the attributes of every option whenever the same
+    collection is priced again.
+
+    :param signs: 1 for calls and -1 for puts
+    :param spots: spot prices of the underlyings
+    :param strikes: option strike prices
+    :param years_to_maturity: the years remaining before maturity - as decimal numbers
+    :param dividends: underlying dividends, expressed as decimal numbers
+    :param prices: option prices
+
+    The distinct maturities are collected in unique_years_to_maturity, while maturity_indices gives the
+    position of the maturity of each option in it. Instances are compared by identity, as comparing numpy
+    arrays field by field would be ambiguous.
+    """
+
+    signs: np.ndarray
+    spots: np.ndarray
+    strikes: np.ndarray
+    years_to_maturity: np.ndarray
+    dividends: np.ndarray
+    prices: np.ndarray
+    unique_years_to_maturity: np.ndarray = field(init=False, repr=False, compare=False)
+    maturity_indices: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # many options usually share the same maturity, so models are evaluated once for each distinct maturity,
+        # and the results are spread to the options through maturity_indices
+        unique_years_to_maturity, maturity_indices = np.unique(self.years_to_maturity, return_inverse=True)
+        object.__setattr__(self, 'unique_years_to_maturity', unique_years_to_maturity)
+        object.__setattr__(self, 'maturity_indices', maturity_indices.reshape(np.shape(self.years_to_maturity)))
+
+    @classmethod
+    def from_options(cls, options: Sequence[VanillaOption]) -> 'VanillaOptionArrays':
+        """
+        Collects the data of some options.
+
+        :param options: a collection of :class:`~option.VanillaOption`
+        :return: the data of the options
+        """
+        return cls(
+            signs=np.array([o.sign for o in options], dtype=float),
+            spots=np.array([o.spot for o in options], dtype=float),
+            strikes=np.array([o.strike for o in options], dtype=float),
+            years_to_maturity=np.array([o.years_to_maturity for o in options], dtype=float),
+            dividends=np.array([o.dividend for o in options], dtype=float),
+            prices=np.array([o.price for o in options], dtype=float)
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    """Columns of :func:`~option.VanillaOptionArrays.to_matrix`, in order"""
+    MATRIX_COLUMNS = ('prices', 'strikes', 'spots', 'years_to_maturity', 'dividends')
+
+    def to_matrix(self) -> np.ndarray:
+        """
+        The numeric data of the options in a single two-dimensional array, with one row for each option and
+        the columns listed in :attr:`~option.VanillaOptionArrays.MATRIX_COLUMNS`. The array is C-contiguous,
+        so that the data of each option is stored in adjacent memory, which suits consumers that iterate
+        over the options one by one. Column-wise computations should rather use the separate arrays.
+
+        :return: a C-contiguous numpy array, with shape (number of options, number of columns)
+        """
+        return np.column_stack([getattr(self, name) for name in self.MATRIX_COLUMNS])
 
 
-def option_list_to_pandas_dataframe(options: List[VanillaOption]) -> pd.DataFrame:
+def implied_volatilities_of_undiscounted_prices(options: Sequence[VanillaOption]) -> np.ndarray:
+    """
+    The implied volatilities of many options, considering undiscounted prices. They are found by a single
+    vectorized solver, and remembered by each option, as if
+    :attr:`~option.VanillaOption.implied_volatility_of_undiscounted_price` had been accessed.
+
+    :param options: a collection of :class:`~option.VanillaOption`
+    :return: the implied volatilities, as a numpy array
+    """
+    arrays = VanillaOptionArrays.from_options(options)
+    volatilities = _implied_volatility(
+        arrays.prices,
+        arrays.spots,
+        arrays.strikes,
+        arrays.years_to_maturity,
+        arrays.signs
+    )
+    for option, volatility in zip(options, volatilities.tolist()):
+        object.__setattr__(option, '_implied_volatility', volatility)
+    return volatilities
+
+
+def option_list_to_pandas_dataframe(options: List[VanillaOption]) -> 'pd.DataFrame':
     """
     A utility function to convert a list of :class:`~option.VanillaOption` to a pandas dataframe.
 
@@ -74,25 +215,46 @@ def option_list_to_pandas_dataframe(options: List[VanillaOption]) -> pd.DataFram
     :return: a pandas dataframe, containing option data
     """
 
-    return pd.DataFrame.from_records([o.to_dict() for o in options])
+    # pandas is imported lazily, as it is only needed by the conversion utilities
+    import pandas as pd
+    # each column is read by a C-level attribute getter, and numeric columns are filled as typed arrays,
+    # so that pandas does not need to infer their type
+    return pd.DataFrame({
+        f.name: np.fromiter(map(attrgetter(f.name), options), dtype=np.float64, count=len(options))
+        if f.type is float else list(map(attrgetter(f.name), options))
+        for f in _CONSTRUCTOR_FIELDS
+    })
 
 
-def pandas_dataframe_to_option_list(data_frame: pd.DataFrame) -> List[VanillaOption]:
+def pandas_dataframe_to_option_list(data_frame: 'pd.DataFrame', dayfirst: bool = False) -> List[VanillaOption]:
     """
     A utility function to convert a pandas dataframe to a list of :class:`~option.VanillaOption`.
     For this function to work, the dataframe columns should be named as the parameters of
-    :class:`~option.VanillaOption`'s constructor.
+    :class:`~option.VanillaOption`'s constructor. Date columns which are not parsed yet, e.g. when
+    the dataframe is read from a CSV file, are converted with a single call to :func:`~pandas.to_datetime`.
 
     :param data_frame: a pandas dataframe, containing option data
+    :param dayfirst: whether unparsed dates start with the day, see :func:`~pandas.to_datetime`
     :return: a list of :class:`~option.VanillaOption`
     """
-    return [VanillaOption(**o) for o in data_frame.to_dict(orient='records')]
+    import pandas as pd
+    # optional fields come last, so the selected columns always match the constructor positional arguments
+    columns = [
+        f.name for f in _CONSTRUCTOR_FIELDS
+        if f.name in data_frame.columns or f.default is MISSING
+    ]
+    values = []
+    for column in columns:
+        series = data_frame[column]
+        if column in _DATE_FIELDS and not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, dayfirst=dayfirst, cache=True)
+        values.append(series.tolist())
+    return [VanillaOption(*row) for row in zip(*values)]
 
 
-def check_option_type(option_type: str):
-    """
-    A utility function to check the validity of the type of an option. Raises a ValueError if the type is invalid.
-    :param option_type: the type of the option: valid types are "c" for call and "p" for put
-    """
-    if option_type not in ('c', 'p'):
-        raise ValueError('option_type shall be either "c" for call or "p" for put')
+_DATE_FIELDS = ('date', 'maturity')
+
+
+# the fields are listed once, so that conversions do not inspect the dataclass for each option
+_CONSTRUCTOR_FIELDS: Tuple[Field, ...] = tuple(f for f in fields(VanillaOption) if f.init)
+_CONSTRUCTOR_FIELD_NAMES: Tuple[str, ...] = tuple(f.name for f in _CONSTRUCTOR_FIELDS)
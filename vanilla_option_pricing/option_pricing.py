@@ -1,11 +1,16 @@
+import copy
+import math
+import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional, Sequence, Union
 
 import numpy as np
-from py_vollib.black import undiscounted_black
-from py_vollib.black_scholes_merton import black_scholes_merton
+from scipy.special import ndtr
 
-from vanilla_option_pricing.option import VanillaOption, check_option_type
+from vanilla_option_pricing.option import VanillaOption, VanillaOptionArrays
+from vanilla_option_pricing.option_type import check_option_type, option_type_signs
 
 
 class OptionPricingModel(ABC):
@@ -13,6 +18,10 @@ class OptionPricingModel(ABC):
     A model which can be used to price European vanilla options.
     """
 
+    __slots__ = ()
+
+    _FINITE_DIFFERENCE_STEP = 1e-6
+
     @property
     @abstractmethod
     def parameters(self) -> Sequence[float]:
@@ -29,43 +38,98 @@ class OptionPricingModel(ABC):
         """
         pass
 
+    def _set_parameters_unchecked(self, value: Sequence[float]):
+        """
+        Sets the model parameters without validating them. Meant for hot loops, like calibration,
+        where the values are already known to be legal.
+        """
+        self.parameters = value
+
+    def clone(self) -> 'OptionPricingModel':
+        """
+        A copy of the model, which can be modified without affecting the original one.
+        The default implementation relies on :func:`~copy.deepcopy`, models should override it with
+        a cheaper explicit copy.
+
+        :return: a new model, with the same parameters
+        """
+        return copy.deepcopy(self)
+
     @abstractmethod
-    def variance(self, t: float) -> float:
+    def variance(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
-        The variance of the model output at a given time.
+        The variance of the model output at a given time. Implementations shall accept both
+        a single time instant and a numpy array of time instants.
 
-        :param t: the time when the variance is evaluated
-        :return: the variance at time t
+        :param t: the time when the variance is evaluated, either a single time instant or a numpy array
+        :return: the variance at time t, with the same shape as t
         """
         pass
 
-    def standard_deviation(self, t: float) -> float:
+    def variance_gradient(self, t: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        The gradient of the :func:`~option_pricing.OptionPricingModel.variance` with respect to
+        the model parameters. The default implementation relies on central finite differences,
+        models should override it with analytical formulas whenever possible.
+
+        :param t: the time when the gradient is evaluated, either a single time instant or a numpy array
+        :return: an array with one row for each parameter, in the same order as
+                 :attr:`~option_pricing.OptionPricingModel.parameters`
+        """
+        parameters = np.array(self.parameters, dtype=float)
+        gradient = []
+        for i, p in enumerate(parameters):
+            step = self._FINITE_DIFFERENCE_STEP * max(abs(p), 1e-3)
+            shifted = parameters.copy()
+            shifted[i] = p + step
+            self._set_parameters_unchecked(shifted)
+            upper = self.variance(t)
+            shifted[i] = p - step
+            self._set_parameters_unchecked(shifted)
+            lower = self.variance(t)
+            gradient.append((upper - lower) / (2 * step))
+        self._set_parameters_unchecked(parameters)
+        return np.array(gradient)
+
+    def standard_deviation(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         The standard deviation of the model output at a given instant,
         that is the squared root of the :func:`~option_pricing.OptionPricingModel.variance`
         at the same instant
 
-        :param t: the time when the standard deviation is evaluated
+        :param t: the time when the standard deviation is evaluated, either a single time instant or a numpy array
         :return: the standard deviation at time t
         """
-        return np.sqrt(self.variance(t))
+        variance = self.variance(t)
+        if isinstance(variance, np.ndarray):
+            return np.sqrt(variance)
+        # negative variances, e.g. round-off errors close to zero, give nan as with numpy
+        return math.sqrt(variance) if variance >= 0 else math.nan
 
-    def volatility(self, t: float) -> float:
+    def volatility(self, t: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         The volatility of the model output at a certain instant,
         that is the :func:`~option_pricing.OptionPricingModel.standard_deviation`
         divided by the squared root of the time
 
-        :param t: the time when the volatility is evaluated
+        :param t: the time when the volatility is evaluated, either a single time instant or a numpy array
         :return: the volatility at time t
         """
-        return self.standard_deviation(t) / np.sqrt(t)
+        variance = self.variance(t)
+        if isinstance(variance, np.ndarray):
+            return np.sqrt(variance / t)
+        if t == 0:
+            # same as the division of numpy floats, without the warning
+            return math.nan if variance == 0 else math.inf
+        variance_rate = variance / t
+        return math.sqrt(variance_rate) if variance_rate >= 0 else math.nan
 
     def price_black_scholes_merton(self, option_type: str, spot: float, strike: float, years_to_maturity: float,
                                    risk_free_rate: float, dividend: float = 0) -> float:
         """
         Finds the no-arbitrage price of a European Vanilla option. The price is computed using the Black-Scholes-Merton
-        framework, but the variance of the underlying is extracted from this model.
+        framework, but the variance of the underlying is extracted from this model. When the variance is zero,
+        e.g. at maturity, the price is the discounted intrinsic value of the forward.
 
         :param option_type: the type of the option (c for call, p for put)
         :param spot: the spot price of the underlying
@@ -75,10 +139,26 @@ class OptionPricingModel(ABC):
         :param dividend: the dividend paid by the underlying - as a decimal number
         :return: the no-arbitrage price of the option
         """
-        volatility = self.volatility(years_to_maturity)
         check_option_type(option_type)
-        price = black_scholes_merton(option_type, spot, strike, years_to_maturity, risk_free_rate, volatility, dividend)
-        return price
+        return self._price_black_scholes_merton(
+            1.0 if option_type == 'c' else -1.0,
+            spot,
+            strike,
+            years_to_maturity,
+            risk_free_rate,
+            dividend
+        )
+
+    def _price_black_scholes_merton(self, sign: float, spot: float, strike: float, years_to_maturity: float,
+                                    risk_free_rate: float, dividend: float) -> float:
+        # same as price_black_scholes_merton, with a sign which is already known to be 1 for calls or -1 for puts
+        forward = spot * math.exp((risk_free_rate - dividend) * years_to_maturity)
+        return math.exp(-risk_free_rate * years_to_maturity) * _scalar_undiscounted_black(
+            sign,
+            forward,
+            strike,
+            self.standard_deviation(years_to_maturity)
+        )
 
     def price_option_black_scholes_merton(self, option: VanillaOption, risk_free_rate: float) -> float:
         """
@@ -89,8 +169,8 @@ class OptionPricingModel(ABC):
         :param risk_free_rate: the risk-free interest rate
         :return: the no-arbitrage price of the option
         """
-        return self.price_black_scholes_merton(
-            option.option_type,
+        return self._price_black_scholes_merton(
+            option.sign,
             option.spot,
             option.strike,
             option.years_to_maturity,
@@ -98,6 +178,30 @@ class OptionPricingModel(ABC):
             option.dividend
         )
 
+    def price_options_black_scholes_merton(self, options: Union[Sequence[VanillaOption], VanillaOptionArrays],
+                                           risk_free_rate: float) -> np.ndarray:
+        """
+        Same as :func:`~option_pricing.OptionPricingModel.price_option_black_scholes_merton`, but prices
+        many options at once, with a single evaluation of the model variance for each distinct maturity.
+
+        :param options: a collection of :class:`~option.VanillaOption`. When the same options are priced
+                        repeatedly, pass their :class:`~option.VanillaOptionArrays` instead
+        :param risk_free_rate: the risk-free interest rate
+        :return: the no-arbitrage prices of the options, as a numpy array
+        """
+        if not isinstance(options, VanillaOptionArrays):
+            options = VanillaOptionArrays.from_options(options)
+        maturities, maturity_indices = options.unique_years_to_maturity, options.maturity_indices
+        return _black_scholes_merton(
+            options.signs,
+            options.spots,
+            options.strikes,
+            options.years_to_maturity,
+            options.dividends,
+            np.exp(-risk_free_rate * maturities)[maturity_indices],
+            self.standard_deviation(maturities)[maturity_indices]
+        )
+
     def price_black(self, option_type: str, spot: float, strike: float, years_to_maturity: float) -> float:
         """
         Finds the no-arbitrage price of a European Vanilla option. Price is computed using the Black
@@ -109,10 +213,13 @@ class OptionPricingModel(ABC):
         :param years_to_maturity: the years remaining before maturity - as a decimal number
         :return: the no-arbitrage price of the option
         """
-        volatility = self.volatility(years_to_maturity)
         check_option_type(option_type)
-        price = undiscounted_black(spot, strike, volatility, years_to_maturity, option_type)
-        return price
+        return _scalar_undiscounted_black(
+            1.0 if option_type == 'c' else -1.0,
+            spot,
+            strike,
+            self.standard_deviation(years_to_maturity)
+        )
 
     def price_option_black(self, option: VanillaOption) -> float:
         """
@@ -122,9 +229,193 @@ class OptionPricingModel(ABC):
         :param option: a :class:`~option.VanillaOption`
         :return: the no-arbitrage price of the option
         """
-        return self.price_black(option.option_type, option.spot, option.strike, option.years_to_maturity)
+        return _scalar_undiscounted_black(
+            option.sign,
+            option.spot,
+            option.strike,
+            self.standard_deviation(option.years_to_maturity)
+        )
+
+    def price_options_black(self, options: Union[Sequence[VanillaOption], VanillaOptionArrays]) -> np.ndarray:
+        """
+        Same as :func:`~option_pricing.OptionPricingModel.price_option_black`, but prices many options at once,
+        with a single evaluation of the model variance for each distinct maturity.
+
+        :param options: a collection of :class:`~option.VanillaOption`, or their :class:`~option.VanillaOptionArrays`
+        :return: the no-arbitrage prices of the options, as a numpy array
+        """
+        if not isinstance(options, VanillaOptionArrays):
+            options = VanillaOptionArrays.from_options(options)
+        return _chunked_undiscounted_black(
+            options.signs,
+            options.spots,
+            options.strikes,
+            np.log(options.spots / options.strikes),
+            self.standard_deviation(options.unique_years_to_maturity)[options.maturity_indices]
+        )
+
+    def price_black_vectorized(self, option_types: Sequence[str], spots: np.ndarray, strikes: np.ndarray,
+                               years_to_maturity: np.ndarray) -> np.ndarray:
+        """
+        Same as :func:`~option_pricing.OptionPricingModel.price_black`, but prices many options at once.
+        All the arguments are arrays of the same length, one element for each option.
+
+        :param option_types: the types of the options (c for call, p for put)
+        :param spots: the spot prices of the underlyings
+        :param strikes: the option strike prices
+        :param years_to_maturity: the years remaining before maturity - as decimal numbers
+        :return: the no-arbitrage prices of the options, as a numpy array
+        """
+        signs = option_type_signs(option_types)
+        spots = np.asarray(spots, dtype=float)
+        strikes = np.asarray(strikes, dtype=float)
+        years_to_maturity = np.asarray(years_to_maturity, dtype=float)
+        signs, spots, strikes, years_to_maturity = np.broadcast_arrays(signs, spots, strikes, years_to_maturity)
+        return _chunked_undiscounted_black(signs, spots, strikes, np.log(spots / strikes),
+                                           self.standard_deviation(years_to_maturity))
 
     @staticmethod
     def _check_positivity(params: Iterable[float], message=''):
         if any(x < 0 for x in params):
             raise ValueError('All values must be non-negative. ' + message)
+
+    @staticmethod
+    def _check_strict_positivity(params: Iterable[float], message=''):
+        if any(x <= 0 for x in params):
+            raise ValueError('All values must be positive. ' + message)
+
+
+def _scalar_undiscounted_black(sign: float, spot: float, strike: float, standard_deviation: float) -> float:
+    """
+    Same as :func:`~option_pricing._undiscounted_black`, but for a single option, avoiding array operations.
+    """
+    if standard_deviation == 0:
+        return max(sign * (spot - strike), 0.0)
+    d1 = math.log(spot / strike) / standard_deviation + 0.5 * standard_deviation
+    d2 = d1 - standard_deviation
+    return float(sign * (spot * ndtr(sign * d1) - strike * ndtr(sign * d2)))
+
+
+def _undiscounted_black(signs: np.ndarray, spots: np.ndarray, strikes: np.ndarray, log_moneyness: np.ndarray,
+                        standard_deviations: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Vectorized undiscounted Black formula. Signs are 1 for calls and -1 for puts, the log-moneyness is
+    log(spots / strikes), while standard deviations are the ones of the log-price at maturity.
+    Intermediate results are computed in place, and the prices are written to out, if provided.
+    Options whose standard deviation is zero, e.g. because they expire immediately, are priced at their
+    intrinsic value.
+    """
+    if out is None:
+        out = np.empty(np.broadcast(signs, spots, strikes, log_moneyness, standard_deviations).shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.divide(log_moneyness, standard_deviations, out=out)
+    d1 += 0.5 * standard_deviations
+    d2 = np.subtract(d1, standard_deviations, out=np.empty_like(d1))
+    d1 *= signs
+    d2 *= signs
+    ndtr(d1, out=d1)
+    ndtr(d2, out=d2)
+    d1 *= spots
+    d2 *= strikes
+    d1 -= d2
+    d1 *= signs
+    # the limit of the formula is the intrinsic value, but at the money it evaluates to 0 / 0
+    zero = standard_deviations == 0
+    if np.any(zero):
+        np.copyto(d1, np.maximum(signs * (spots - strikes), 0), where=zero)
+    return d1
+
+
+"""Number of options priced together by each thread in large batches"""
+_CHUNK_SIZE = 16384
+
+
+def _chunked_undiscounted_black(signs: np.ndarray, spots: np.ndarray, strikes: np.ndarray,
+                                log_moneyness: np.ndarray, standard_deviations: np.ndarray) -> np.ndarray:
+    """
+    Same as :func:`~option_pricing._undiscounted_black`, but large batches are split in chunks which are priced
+    by a pool of threads, see :func:`~option_pricing._in_chunks`. All the arguments must be arrays of the same shape.
+    """
+    return _in_chunks(_undiscounted_black, signs, spots, strikes, log_moneyness, standard_deviations)
+
+
+def _in_chunks(kernel: Callable[..., np.ndarray], *arrays: np.ndarray) -> np.ndarray:
+    """
+    Applies an element-wise kernel to some arrays of the same shape. Large batches are split in chunks which are
+    processed by a pool of threads: NumPy and SciPy release the GIL inside their ufuncs, and chunks small enough
+    to fit in cache avoid the allocation of large temporary arrays. The kernel receives the chunks of the arrays,
+    in the same order, and must write its results to the array passed as out.
+    """
+    shape = arrays[-1].shape
+    size = arrays[-1].size
+    if size <= _CHUNK_SIZE:
+        return kernel(*arrays, out=np.empty(shape))
+    arrays = [np.ravel(a) for a in arrays]
+    results = np.empty(size)
+
+    def _process_chunk(start: int):
+        chunk = slice(start, start + _CHUNK_SIZE)
+        kernel(*(a[chunk] for a in arrays), out=results[chunk])
+
+    list(_get_executor().map(_process_chunk, range(0, size, _CHUNK_SIZE)))
+    return results.reshape(shape)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # the pool is created on first use and shared by all the batches, as starting threads for each
+    # of them, e.g. at every evaluation of a calibration loss, would eat into the gain of chunking
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='vanilla_option_pricing')
+    return _executor
+
+
+def _reset_executor():
+    # the threads of the pool do not survive a fork, so a child process must create its own pool,
+    # and a fresh lock, as the one of the parent may have been held while forking
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def _undiscounted_black_vega(spots: np.ndarray, log_moneyness: np.ndarray,
+                             standard_deviations: np.ndarray) -> np.ndarray:
+    """
+    Derivative of the undiscounted Black formula with respect to the standard deviation
+    of the log-price at maturity. It is the same for calls and puts.
+    """
+    d1 = log_moneyness / standard_deviations + 0.5 * standard_deviations
+    return spots * np.exp(-0.5 * d1 * d1) / np.sqrt(2 * np.pi)
+
+
+def _black_scholes_merton(signs: np.ndarray, spots: np.ndarray, strikes: np.ndarray, years_to_maturity: np.ndarray,
+                          dividends: np.ndarray, discount_factors: np.ndarray,
+                          standard_deviations: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Black-Scholes-Merton formula, that is the undiscounted Black formula applied to the
+    forward prices and discounted at the risk-free rate. The discount factors exp(-risk_free_rate * t)
+    are provided by the caller, who can compute them once for each distinct maturity.
+    """
+    def _price(signs, spots, strikes, years_to_maturity, dividends, discount_factors, standard_deviations, out):
+        # the whole formula is evaluated chunk by chunk, so that forwards are computed by the same thread
+        # which prices the chunk, while it is still in cache
+        forwards = spots * np.exp(-dividends * years_to_maturity) / discount_factors
+        _undiscounted_black(signs, forwards, strikes, np.log(forwards / strikes), standard_deviations, out=out)
+        out *= discount_factors
+        return out
+
+    return _in_chunks(
+        _price,
+        *np.broadcast_arrays(signs, spots, strikes, years_to_maturity, dividends, discount_factors,
+                             standard_deviations)
+    )
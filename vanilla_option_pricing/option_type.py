@@ -0,0 +1,27 @@
+from typing import Sequence
+
+import numpy as np
+
+
+def check_option_type(option_type: str):
+    """
+    A utility function to check the validity of the type of an option. Raises a ValueError if the type is invalid.
+    :param option_type: the type of the option: valid types are "c" for call and "p" for put
+    """
+    if option_type not in ('c', 'p'):
+        raise ValueError('option_type shall be either "c" for call or "p" for put')
+
+
+def option_type_signs(option_types: Sequence[str]) -> np.ndarray:
+    """
+    A utility function to encode the types of many options as numbers, checking them all at once.
+    Raises a ValueError if any type is invalid.
+    :param option_types: the types of the options: valid types are "c" for call and "p" for put
+    :return: a numpy array, with 1 for calls and -1 for puts
+    """
+    option_types = np.asarray(option_types, dtype=str)
+    calls = option_types == 'c'
+    invalid = ~calls & (option_types != 'p')
+    if invalid.any():
+        check_option_type(option_types[invalid].flat[0])
+    return np.where(calls, 1.0, -1.0)